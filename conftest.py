@@ -4,5 +4,53 @@ from __future__ import absolute_import
 import sys
 import os
 
+import pytest
+
 if sys.version_info[0] < 3:
     os.environ["DJANGO_SETTINGS_MODULE"] = "tests.nsot_settings"
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        '--integration', action='store_true', default=False,
+        help='Run integration tests against a live NSoT server.'
+    )
+    parser.addoption(
+        '--in-process', action='store_true', default=False,
+        help='Serve API requests in-process instead of over HTTP.'
+    )
+
+
+# Fixtures that start (or need) a live NSoT server.
+LIVE_SERVER_FIXTURES = ('config', 'live_server')
+
+
+def pytest_collection_modifyitems(config, items):
+    """
+    Skip tests that need a live NSoT server unless --integration was given.
+
+    Those are the tests using ``live_server``, or ``config`` (and with it
+    ``client``, ``site_client``, ``runner`` etc.).
+
+    Tests using ``config`` also get the database fixture it needs put in
+    their fixture closure: ``live_server`` normally, or ``db`` with
+    --in-process. ``config`` asks for these with ``request.getfixturevalue()``,
+    but pytest-django decides from the closure whether a test gets a flushed
+    database (``transactional_db``) and the live server's settings, so they
+    have to be listed up front.
+    """
+    integration = config.getoption('--integration')
+    if config.getoption('--in-process'):
+        needed = 'db'
+    else:
+        needed = 'live_server'
+
+    skip = pytest.mark.skip(reason='requires --integration')
+    for item in items:
+        fixturenames = getattr(item, 'fixturenames', ())
+        if 'config' in fixturenames and needed not in fixturenames:
+            fixturenames.append(needed)
+        if integration:
+            continue
+        if any(name in fixturenames for name in LIVE_SERVER_FIXTURES):
+            item.add_marker(skip)
@@ -83,6 +83,11 @@ class BaseClient(slumber.API):
         self._auth = auth
         self._headers = self._store['session'].headers
 
+    @property
+    def auth(self):
+        """The authentication instance this client sends requests with."""
+        return self._auth
+
     def _fetch_resources(self):
         """Fetch resources from API"""
         headers = self._headers
@@ -37,7 +37,9 @@ class DotfileError(Exception):
 
 class Dotfile(object):
     """Create, read, and write a dotfile."""
-    def __init__(self, filepath=constants.DOTFILE_USER_PATH, **kwargs):
+    def __init__(self, filepath=None, **kwargs):
+        if filepath is None:
+            filepath = constants.DOTFILE_USER_PATH
         self.filepath = filepath
 
     def read(self, **kwargs):
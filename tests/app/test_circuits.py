@@ -140,10 +140,10 @@ def test_circuits_list_grep_output(runner, circuit):
         "test_circuit vendor=lasers go pew pew\n"
         "test_circuit endpoint_a=foo-bar01:eth0\n"
         "test_circuit endpoint_z=foo-bar02:eth0\n"
-        "test_circuit id=9\n"
+        "test_circuit id={}\n"
         "test_circuit name=test_circuit\n"
         "test_circuit name_slug=test_circuit\n"
-    )
+    ).format(circuit['id'])
 
     with runner.isolated_filesystem():
         result = runner.run('circuits list -g')
@@ -18,7 +18,7 @@ from tests.fixtures.protocol_types import (protocol_type, protocol_types,
                                            protocol_attribute,
                                            protocol_attribute2)
 
-from tests.util import CliRunner, assert_output
+from tests.util import CliRunner, assert_all_in, assert_output
 
 log = logging.getLogger(__name__)
 
@@ -112,8 +112,7 @@ def test_protocol_types_list_limit(site_client, protocol_types):
         expected_types = protocol_types[:limit]
         unexpected_types = protocol_types[limit:]
 
-        for t in expected_types:
-            assert t['name'] in result.output
+        assert_all_in([t['name'] for t in expected_types], result.output)
         for t in unexpected_types:
             assert t['name'] not in result.output
 
@@ -136,8 +135,7 @@ def test_protocol_types_list_offset(site_client, protocol_types):
         expected_types = protocol_types[offset:limit+offset]
         unexpected_types = protocol_types[limit+offset:]
 
-        for t in expected_types:
-            assert t['name'] in result.output
+        assert_all_in([t['name'] for t in expected_types], result.output)
         for t in unexpected_types:
             assert t['name'] not in result.output
 
@@ -17,7 +17,7 @@ from tests.fixtures.circuits import (circuit, circuit_attributes, interface_a,
 from tests.fixtures.protocols import (protocol, protocols, protocol_attribute,
                                       protocol_attribute2)
 
-from tests.util import CliRunner, assert_output
+from tests.util import CliRunner, assert_all_in, assert_output
 
 log = logging.getLogger(__name__)
 
@@ -129,8 +129,8 @@ def test_protocols_list_limit(site_client, protocols):
         expected_protocols = protocols[:limit]
         unexpected_protocols = protocols[limit:]
 
-        for p in expected_protocols:
-            assert p['device'] in result.output
+        expected = [p['device'] for p in expected_protocols]
+        assert_all_in(expected, result.output)
         for p in unexpected_protocols:
             assert p['device'] not in result.output
 
@@ -151,8 +151,8 @@ def test_protocols_list_offset(site_client, protocols):
         expected_protocols = protocols[offset:limit+offset]
         unexpected_protocols = protocols[limit+offset:]
 
-        for p in expected_protocols:
-            assert p['device'] in result.output
+        expected = [p['device'] for p in expected_protocols]
+        assert_all_in(expected, result.output)
         for p in unexpected_protocols:
             assert p['device'] not in result.output
 
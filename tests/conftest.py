@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+
+"""
+Shared test configuration and fixtures.
+"""
+
+from __future__ import unicode_literals
+from __future__ import absolute_import
+import logging
+import os
+
+import pytest
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from six.moves.urllib.parse import urlsplit
+import slumber
+
+from pynsot import constants
+from tests.fixtures import (  # noqa: F401
+    attribute, attributes, auth_header_config, bulk_dir, client,
+    client_runner, config, device, device_with_multi, django_user_model,
+    interface, interface_network, live_server, network, owner_attrs,
+    owner_devices, owner_networks, protocol_type, runner, runner_root,
+    site, site_client
+)
+from tests.util import IN_PROCESS_URL
+
+
+# Logger
+log = logging.getLogger(__name__)
+
+# Request headers that Django expects outside of the HTTP_* namespace.
+UNPREFIXED_HEADERS = ('content-length', 'content-type')
+
+
+class DjangoClientAdapter(BaseAdapter):
+    """
+    Transport adapter that answers requests with ``django.test.Client``.
+
+    Requests never leave the process: they are dispatched straight to the
+    NSoT views running in the test process, against the test database.
+    """
+    def __init__(self):
+        super(DjangoClientAdapter, self).__init__()
+        from django.test import Client
+        self.client = Client()
+
+    def send(self, request, **kwargs):
+        url = urlsplit(request.url)
+        path = url.path
+        if url.query:
+            path += '?' + url.query
+
+        extra = {}
+        for key, value in request.headers.items():
+            if key.lower() not in UNPREFIXED_HEADERS:
+                extra['HTTP_' + key.upper().replace('-', '_')] = value
+
+        log.debug('In-process %s %s', request.method, path)
+        content_type = request.headers.get('Content-Type', '')
+        resp = self.client.generic(
+            request.method, path, data=request.body or '',
+            content_type=content_type, **extra
+        )
+
+        response = requests.Response()
+        response.status_code = resp.status_code
+        response.headers = CaseInsensitiveDict(resp.items())
+        response._content = resp.content
+        response.encoding = requests.utils.get_encoding_from_headers(
+            response.headers
+        )
+        response.url = request.url
+        response.request = request
+        response.reason = resp.reason_phrase
+        return response
+
+    def close(self):
+        pass
+
+
+@pytest.fixture(scope='session')
+def home_dir(tmpdir_factory):
+    """A stand-in for the user's home directory."""
+    return tmpdir_factory.mktemp('home')
+
+
+@pytest.fixture(autouse=True)
+def _home(monkeypatch, home_dir):
+    """
+    Point ``~`` (and with it ``~/.pynsotrc``) at ``home_dir``, so that tests
+    never read or clobber the real user's dotfile.
+    """
+    monkeypatch.setenv('HOME', str(home_dir))
+    monkeypatch.setattr(
+        constants, 'DOTFILE_USER_PATH',
+        os.path.join(str(home_dir), constants.DOTFILE_NAME)
+    )
+
+
+@pytest.fixture(scope='session')
+def http_session(request):
+    """
+    A keep-alive HTTP session whose connection pools are shared by every API
+    client.
+
+    With --in-process, that session is served by ``DjangoClientAdapter`` at
+    ``IN_PROCESS_URL`` instead of going over the loopback interface to
+    ``live_server``.
+    """
+    session = requests.Session()
+    # Everything goes to the one test server, so a single small pool will do.
+    session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=4))
+    if request.config.getoption('--in-process'):
+        session.mount(IN_PROCESS_URL, DjangoClientAdapter())
+    yield session
+    session.close()
+
+
+@pytest.fixture(autouse=True)
+def _shared_http_session(request, monkeypatch, http_session):
+    """
+    Make every API client (including those created by each CLI invocation)
+    reuse the connection pools of ``http_session`` instead of opening new
+    ones. That includes the one-off ``requests.get/post`` calls made while
+    authenticating.
+
+    Only the transport adapters are shared. slumber sets ``auth`` (and the
+    client sets headers) on its session, so each client still gets a
+    session of its own, and the auth-less calls get a bare one.
+    """
+    def session():
+        s = requests.Session()
+        s.adapters = http_session.adapters
+        return s
+
+    def get(url, **kwargs):
+        return session().get(url, **kwargs)
+
+    def post(url, data=None, json=None, **kwargs):
+        return session().post(url, data=data, json=json, **kwargs)
+
+    # Each test gets a fresh database, so don't leak cookies between them.
+    if request.config.getoption('--in-process'):
+        http_session.get_adapter(IN_PROCESS_URL).client.cookies.clear()
+    monkeypatch.setattr(slumber.requests, 'session', session)
+    monkeypatch.setattr(slumber.requests, 'get', get)
+    monkeypatch.setattr(slumber.requests, 'post', post)
@@ -13,7 +13,7 @@ import pytest
 from pytest_django.fixtures import live_server, django_user_model
 
 from pynsot.client import get_api_client
-from tests.util import CliRunner
+from tests.util import IN_PROCESS_URL, CliRunner
 
 __all__ = ('django_user_model', 'live_server')
 
@@ -31,6 +31,42 @@ AUTH_HEADER_CONFIG = {
     'auth_header': 'X-NSoT-Email',
 }
 
+# Contents of the files written by the ``bulk_dir`` fixture, keyed on name.
+BULK_FILES = {
+    'devices_add': (
+        'hostname:attributes\n'
+        'foo-bar1:owner=jathan\n'
+        'foo-bar2:owner=jathan\n'
+    ),
+    'devices_fail': (
+        'hostname:attributes\n'
+        'foo-bar3:owner=jathan,bacon=delicious\n'
+        'foo-bar4:owner=jathan\n'
+    ),
+    'networks_add': (
+        'cidr:attributes\n'
+        '10.0.0.0/8:owner=jathan\n'
+        '10.0.0.0/24:owner=jathan\n'
+    ),
+    'networks_fail': (
+        'cidr:attributes\n'
+        '10.10.0.0/24:owner=jathan,bacon=delicious\n'
+        '10.11.0.0/24:owner=jathan\n'
+    ),
+    'networks_subcommands': (
+        'cidr:attributes\n'
+        '10.10.10.0/24:owner=jathan\n'
+        '10.10.10.1/32:owner=jathan\n'
+        '10.10.10.2/32:owner=jathan\n'
+        '10.10.10.3/32:owner=jathan\n'
+    ),
+    'networks_allocation': (
+        'cidr:attributes\n'
+        '10.2.1.0/24:foo=bar\n'
+        '10.2.1.0/25:foo=bar\n'
+    ),
+}
+
 # This is used to test dotfile settings.
 DOTFILE_CONFIG_DATA = {
     'auth_token': {
@@ -50,8 +86,31 @@ DOTFILE_CONFIG_DATA = {
 
 
 @pytest.fixture
-def config(live_server, django_user_model):
-    """Create a user and return an auth_token config matching that user."""
+def config(request):
+    """
+    Create a user and return an auth_token config matching that user.
+
+    This must stay function-scoped. ``live_server`` is already shared across
+    the session, but it serves requests from another thread, so pytest-django
+    gives each test a flushed database (``transactional_db``) instead of a
+    transaction that could be rolled back. The user, and therefore the
+    ``secret_key``, is new for every test. pytest-django only notices that
+    from the fixture closure, so the ``pytest_collection_modifyitems`` hook
+    in the root conftest.py puts ``live_server`` (or ``db``) there for tests
+    using this.
+
+    With --in-process there is no server thread: API requests are handled in
+    the test's own thread, so each test just runs in a transaction (``db``,
+    via ``django_user_model``) that is rolled back afterwards.
+    """
+    # Pick the database mode before anything else asks for ``db``.
+    if request.config.getoption('--in-process'):
+        url = IN_PROCESS_URL
+    else:
+        request.getfixturevalue('transactional_db')
+        url = request.getfixturevalue('live_server').url
+
+    django_user_model = request.getfixturevalue('django_user_model')
     user = django_user_model.objects.create(
         email='jathan@localhost', is_superuser=True, is_staff=True
     )
@@ -59,7 +118,7 @@ def config(live_server, django_user_model):
         'email': user.email,
         'secret_key': user.secret_key,
         'auth_method': 'auth_token',
-        'url': live_server.url + '/api',
+        'url': url + '/api',
         # 'api_version': API_VERSION,
         'api_version': '1.0',  # Hard-coded.
     }
@@ -70,8 +129,8 @@ def config(live_server, django_user_model):
 @pytest.fixture
 def auth_header_config(config):
     """Return an auth_header config."""
+    config = dict(config, **AUTH_HEADER_CONFIG)
     config.pop('secret_key')
-    config.update(AUTH_HEADER_CONFIG)
     return config
 
 
@@ -92,14 +151,54 @@ def site(client):
 @pytest.fixture
 def site_client(client, site):
     """Returns a client tied to a specific site."""
-    client.config['default_site'] = site['id']
+    client.config = dict(client.config, default_site=site['id'])
     client.default_site = site['id']
     return client
 
 
 @pytest.fixture
-def runner(site_client):
-    return CliRunner(site_client.config)
+def client_runner(client):
+    """
+    Return a CliRunner whose dotfile is set up for ``client``, with no
+    default site.
+    """
+    runner = CliRunner(client.config)
+    runner.share_auth_token(client)
+    with runner.isolated_dotfile():
+        yield runner
+
+
+@pytest.fixture(scope='session')
+def runner_root(tmpdir_factory):
+    """Return the working directory shared by every ``runner``."""
+    return tmpdir_factory.mktemp('runner')
+
+
+@pytest.fixture
+def runner(site_client, runner_root):
+    """
+    Return a CliRunner whose dotfile is set up for ``site_client``.
+
+    Its ``isolated_filesystem()`` is ``runner_root``, which is shared, so
+    tests should not write files of their own there.
+    """
+    runner = CliRunner(site_client.config, root=str(runner_root))
+    runner.share_auth_token(site_client)
+    with runner.isolated_dotfile():
+        yield runner
+
+
+@pytest.fixture(scope='session')
+def bulk_dir(tmpdir_factory):
+    """
+    Return a directory holding the ``BULK_FILES`` for ``... add -b``.
+
+    They never change, so they are only written once for the whole run.
+    """
+    path = tmpdir_factory.mktemp('bulk')
+    for name, contents in BULK_FILES.items():
+        path.join(name).write(contents)
+    return path
 
 
 @pytest.fixture
@@ -177,6 +276,70 @@ def interface(site_client, attributes, device, network):
     )
 
 
+@pytest.fixture
+def device_with_multi(request, site_client):
+    """
+    Return Device foo-bar1 after creating a ``multi`` Device attribute.
+
+    Parametrize indirectly with a list of values to set ``multi`` on the
+    device; by default it is left unset.
+    """
+    site = site_client.sites(site_client.default_site)
+    site.attributes.post(
+        {'name': 'multi', 'resource_name': 'Device', 'multi': True}
+    )
+    values = getattr(request, 'param', None)
+    attributes = {'multi': values} if values else {}
+    return site.devices.post(
+        {'hostname': 'foo-bar1', 'attributes': attributes}
+    )
+
+
+@pytest.fixture
+def owner_attrs(site_client):
+    """Return the ``owner`` Attributes for Devices and Networks."""
+    site = site_client.sites(site_client.default_site)
+    return site.attributes.post([
+        {'name': 'owner', 'resource_name': 'Device'},
+        {'name': 'owner', 'resource_name': 'Network'},
+    ])
+
+
+@pytest.fixture
+def owner_devices(site_client, owner_attrs):
+    """Return Devices foo-bar1 and foo-bar2, both with owner=jathan."""
+    site = site_client.sites(site_client.default_site)
+    return site.devices.post([
+        {'hostname': 'foo-bar1', 'attributes': {'owner': 'jathan'}},
+        {'hostname': 'foo-bar2', 'attributes': {'owner': 'jathan'}},
+    ])
+
+
+@pytest.fixture
+def owner_networks(site_client, owner_attrs):
+    """Return Networks 10.0.0.0/8 and 10.0.0.0/24, both with owner=jathan."""
+    site = site_client.sites(site_client.default_site)
+    return site.networks.post([
+        {'cidr': '10.0.0.0/8', 'attributes': {'owner': 'jathan'}},
+        {'cidr': '10.0.0.0/24', 'attributes': {'owner': 'jathan'}},
+    ])
+
+
+@pytest.fixture
+def interface_network(site_client):
+    """
+    Return the 10.10.10.0/24 Network used for Interface addresses.
+
+    The ``vlan`` and ``metro`` Interface attributes are created as well.
+    """
+    site = site_client.sites(site_client.default_site)
+    site.attributes.post([
+        {'name': 'vlan', 'resource_name': 'Interface'},
+        {'name': 'metro', 'resource_name': 'Interface'},
+    ])
+    return site.networks.post({'cidr': '10.10.10.0/24'})
+
+
 @pytest.fixture
 def protocol_type(site_client):
     """
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+
+"""
+Test the shared fixtures.
+"""
+
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+from tests.util import IN_PROCESS_URL
+
+
+def test_config_url(request, config):
+    """Test that ``config`` points at the server used for this run."""
+    if request.config.getoption('--in-process'):
+        url = IN_PROCESS_URL
+    else:
+        url = request.getfixturevalue('live_server').url
+    assert config['url'] == url + '/api'
+
+
+def test_config_database(request, config):
+    """
+    Test that ``config`` runs in a flushed database with ``live_server``, and
+    in a transaction that is rolled back with --in-process.
+    """
+    from django.db import connection
+    in_process = request.config.getoption('--in-process')
+    assert connection.in_atomic_block == in_process
@@ -18,6 +18,10 @@ import shutil
 import socket
 import struct
 import tempfile
+try:
+    from unittest import mock
+except ImportError:
+    import mock  # Python 2.7
 
 from pynsot.app import app
 from pynsot import client
@@ -41,66 +45,157 @@ ATTRIBUTE_DATA = {
 # Used to store Attribute/value pairs
 Attribute = collections.namedtuple('Attribute', 'name value')
 
-# Hard-code the app name as 'nsot' to match the CLI util.
+# Base URL of the NSoT API when tests are run with --in-process.
+IN_PROCESS_URL = 'http://testserver'
+
+# Hard-code the app name as 'nsot' to match the CLI util. This is the one
+# import of the app for the whole test run; CliRunner.run() invokes it as-is.
 app.name = 'nsot'
 
+# Split CliRunner.run() commands, keyed on the command string.
+_SPLIT_COMMANDS = {}
+
 
 class CliRunner(BaseCliRunner):
     """
     Subclass of CliRunner that also creates a .pynsotrc in the isolated
     filesystem.
+
+    If ``root`` is given, ``isolated_filesystem()`` changes into that
+    directory instead of creating (and removing) a temporary one each time.
     """
     def __init__(self, client_config, *args, **kwargs):
         self.client_config = client_config
+        self.root = kwargs.pop('root', None)
+        self._auth_tokens = {}
         super(CliRunner, self).__init__(*args, **kwargs)
 
+    def invoke(self, *args, **kwargs):
+        """
+        Invoke the CLI, reusing any auth_token fetched by an earlier call.
+
+        Every invocation builds a new API client, which would otherwise hit
+        ``/authenticate/`` again for the same credentials.
+        """
+        auth_class = client.AuthTokenAuthentication
+        get_token = auth_class.get_token
+        tokens = self._auth_tokens
+
+        def cached_get_token(auth, base_url, email, secret_key):
+            key = (base_url, email, secret_key)
+            if key not in tokens:
+                tokens[key] = get_token(auth, base_url, email, secret_key)
+            return tokens[key]
+
+        with mock.patch.object(auth_class, 'get_token', cached_get_token):
+            return super(CliRunner, self).invoke(*args, **kwargs)
+
+    def share_auth_token(self, api):
+        """
+        Reuse the auth_token already fetched by the API client ``api`` for
+        every invocation, instead of authenticating again on the first one.
+
+        :param api:
+            API client built from ``client_config``
+        """
+        auth = api.auth
+        if not isinstance(auth, client.AuthTokenAuthentication):
+            return  # Nothing to share for e.g. auth_header
+        config = self.client_config
+        key = (config['url'], config['email'], config['secret_key'])
+        self._auth_tokens[key] = auth.auth_token
+
+    @contextlib.contextmanager
+    def isolated_dotfile(self):
+        """
+        A context manager that writes the client config to ``~/.pynsotrc``
+        without touching the current working directory.
+
+        Use this instead of ``isolated_filesystem()`` for tests that never
+        write files of their own. The ``_home`` fixture in conftest.py points
+        ``~`` at a temporary directory, so the real user's dotfile is never
+        touched.
+        """
+        rcfile = dotfile.Dotfile()
+        rcfile.write(self.client_config)
+        yield rcfile.filepath
+
     @contextlib.contextmanager
     def isolated_filesystem(self):
         """
         A context manager that creates a temporary folder and changes
         the current working directory to it for isolated filesystem tests.
-        """
-        # If user config is found, back it up for duration of each test.
-        config_path = os.path.expanduser('~/.pynsotrc')
-        backup_path = config_path + '.orig'
-        backed_up = False
-        if os.path.exists(config_path):
-            log.debug('Config found, backing up...')
-            os.rename(config_path, backup_path)
-            backed_up = True
 
+        With a ``root``, this just changes into it and back. The dotfile is
+        left alone, since whoever handed out ``root`` (e.g. the ``runner``
+        fixture) has already written it.
+        """
         cwd = os.getcwd()
+        if self.root is not None:
+            os.chdir(self.root)
+            try:
+                yield self.root
+            finally:
+                os.chdir(cwd)
+            return
+
         t = tempfile.mkdtemp()
         os.chdir(t)
-        rcfile = dotfile.Dotfile(config_path)
-        rcfile.write(self.client_config)
         try:
-            yield t
+            with self.isolated_dotfile():
+                yield t
         finally:
             os.chdir(cwd)
-            if backed_up:
-                log.debug('Restoring original config.')
-                os.rename(backup_path, config_path)  # Restore original
-            try:
-                shutil.rmtree(t)
-            except (OSError, IOError):
-                pass
+            _remove_tempdir(t)
 
     def run(self, command, **kwargs):
         """
         Shortcut to invoke to parse command and pass app along.
 
         :param command:
-            Command args e.g. 'devices list'
+            Command args e.g. 'devices list', or an already split list of
+            args e.g. ['devices', 'list'], which is passed through as-is
 
         :param kwargs:
             Extra keyword arguments to pass to ``invoke()``
         """
-        cmd_parts = shlex.split(command)
+        if isinstance(command, (list, tuple)):
+            cmd_parts = list(command)
+        else:
+            cmd_parts = list(_split_command(command))
         result = self.invoke(app, cmd_parts, **kwargs)
         return result
 
 
+def _split_command(command):
+    """
+    Return ``command`` split into a tuple of args.
+
+    Most command strings are run by many tests, so only lex each one once.
+    """
+    try:
+        return _SPLIT_COMMANDS[command]
+    except KeyError:
+        cmd_parts = tuple(shlex.split(command))
+        _SPLIT_COMMANDS[command] = cmd_parts
+        return cmd_parts
+
+
+def _remove_tempdir(path):
+    """
+    Remove a temporary directory created by ``isolated_filesystem()``.
+
+    Tests only ever leave a few plain files behind, so unlink those directly
+    and only fall back to ``shutil.rmtree()`` if there is anything else.
+    """
+    try:
+        for name in os.listdir(path):
+            os.unlink(os.path.join(path, name))
+        os.rmdir(path)
+    except (OSError, IOError):
+        shutil.rmtree(path, ignore_errors=True)
+
+
 def assert_output(result, expected, exit_code=0):
     """
     Assert that output matches the conditions.
@@ -128,7 +223,25 @@ def assert_output(result, expected, exit_code=0):
             log.info('matched: %r', (expected,))
             break
     else:
-        assert False
+        assert False, 'Expected %r on a single line of output:\n%s' % (
+            expected, result.output
+        )
+
+
+def assert_all_in(needles, text):
+    """
+    Assert that every item is found somewhere in the text.
+
+    Unlike ``assert_output()``, the items do not have to share a line.
+
+    :param needles:
+        List/tuple of expected substrings
+
+    :param text:
+        Text to search, typically ``result.output``
+    """
+    missing = [n for n in needles if n not in text]
+    assert not missing, 'Expected %r in output:\n%s' % (missing, text)
 
 
 def assert_outputs(result, expected_list, exit_code=0):